@@ -1,26 +1,107 @@
 # dashboard.py
 import base64
+import hashlib
 import io
-import json
 import math
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import dash
 from dash import dcc, html, dash_table, Input, Output, State
 import dash_bootstrap_components as dbc
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
-from scipy import stats
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from flask_caching import Cache
+from numba import njit
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.LUX], suppress_callback_exceptions=True)
 server = app.server
 app.title = "Insightify — Professional Data Analysis Dashboard"
 
+# Server-side cache: the browser store only holds a content key, the parsed
+# frame and its expensive derivatives live here.
+cache = Cache(server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': os.path.join(tempfile.gettempdir(), 'insightify'),
+    'CACHE_DEFAULT_TIMEOUT': 60 * 60,
+    # every filter combination adds a few derivative entries
+    'CACHE_THRESHOLD': 5000,
+})
+# The dataset is the one entry that can't be rebuilt. When over the threshold
+# the cache drops entries by expiry time (soonest first, and a timeout of 0
+# counts as soonest), so it outlives the derivatives instead of never expiring
+DATASET_TIMEOUT = 24 * 60 * 60
+
 # CONSTANT (fixed) columns we always analyze
 FIXED = ['title', 'mrp', 'current_price', 'discount', 'rating', 'review']
+# Upper bound on points shipped to the browser for the scatter plot
+MAX_SCATTER_POINTS = 5000
+# Marks drawn in the price histogram's rug strip
+MAX_RUG_POINTS = 2000
+# Rows drawn in the missing-data heatmap; more than this is below pixel resolution
+MAX_HEATMAP_ROWS = 2000
+# CSV uploads above this size are parsed and cleaned chunk by chunk
+LARGE_UPLOAD_BYTES = 50_000_000
+CSV_CHUNK_ROWS = 100_000
+# Preview table: rows kept from the filtered frame, served one page at a time
+PREVIEW_ROWS = 200
 # We'll accept case-insensitive column names by normalizing incoming df columns.
 
+# pandas' default NA tokens, so Arrow reads "N/A", "null", ... as missing too
+CSV_NULL_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+                   '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+                   'n/a', 'nan', 'null']
+
 # ---------- Helper functions ----------
+def read_csv_pandas(data: bytes) -> pd.DataFrame:
+    # csv fallback (utf-8, then latin-1); pads short rows with NaN
+    try:
+        return pd.read_csv(io.BytesIO(data), low_memory=False, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(io.BytesIO(data), low_memory=False, encoding='latin-1')
+
+def read_csv_bytes(data: bytes) -> pd.DataFrame:
+    # Arrow parses straight from the raw bytes (multithreaded), so the upload is
+    # never decoded into one big Python str first
+    read_options = pacsv.ReadOptions(block_size=8 << 20)
+    convert_options = pacsv.ConvertOptions(strings_can_be_null=True, null_values=CSV_NULL_VALUES)
+    try:
+        try:
+            table = pacsv.read_csv(io.BytesIO(data), read_options=read_options, convert_options=convert_options)
+            headers = table.column_names
+            # invalid utf-8 in a column makes Arrow infer it as binary
+            latin1 = any(pa.types.is_binary(t) for t in table.schema.types)
+        except (pa.ArrowInvalid, UnicodeDecodeError):
+            latin1 = True
+        if latin1:
+            read_options.encoding = 'latin-1'
+            table = pacsv.read_csv(io.BytesIO(data), read_options=read_options, convert_options=convert_options)
+            headers = table.column_names
+    except pa.ArrowInvalid:
+        # e.g. a ragged row, which Arrow rejects and pandas pads
+        return read_csv_pandas(data)
+    # Arrow keeps duplicate headers as-is; mangle them like pandas ("Brand.1")
+    names, seen = [], {}
+    for name in headers:
+        if name in seen:
+            seen[name] += 1
+            names.append(f"{name}.{seen[name]}")
+        else:
+            seen[name] = 0
+            names.append(name)
+    return table.rename_columns(names).to_pandas()
+
+# pandas releases the GIL in to_numeric/unique/nunique, so per-column work
+# overlaps across threads
+column_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+def map_columns(func, df: pd.DataFrame, cols) -> dict:
+    cols = list(cols)
+    return dict(zip(cols, column_pool.map(lambda c: func(df[c]), cols)))
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     # Strip, lower column names and map to nice names where possible
     mapping = {}
@@ -34,7 +115,7 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 def coerce_and_prepare(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    # Works in place: callers always pass a freshly parsed frame
     # remove url if present
     if 'url' in df.columns:
         df.drop(columns=['url'], inplace=True)
@@ -44,9 +125,9 @@ def coerce_and_prepare(df: pd.DataFrame) -> pd.DataFrame:
             df[c] = np.nan
 
     # numeric conversions
-    for col in ['mrp','current_price','discount','rating','review']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    numeric = [col for col in ['mrp','current_price','discount','rating','review'] if col in df.columns]
+    for col, values in map_columns(lambda s: pd.to_numeric(s, errors='coerce'), df, numeric).items():
+        df[col] = values
 
     # rows with missing title are not helpful
     if 'title' in df.columns:
@@ -54,21 +135,117 @@ def coerce_and_prepare(df: pd.DataFrame) -> pd.DataFrame:
 
     # basic fixes:
     if 'mrp' in df.columns and 'current_price' in df.columns:
-        mask = df['mrp'].isna() & df['current_price'].notna()
-        df.loc[mask, 'mrp'] = df.loc[mask, 'current_price']
+        # write only the missing rows, so a complete int64 column stays int64
+        missing = df['mrp'].isna().to_numpy()
+        if missing.any():
+            df.loc[missing, 'mrp'] = df['current_price'].to_numpy()[missing]
     if 'discount' in df.columns:
-        df['discount'] = df['discount'].fillna(0)
-        df.loc[df['discount'] < 0, 'discount'] = 0
+        df['discount'] = df['discount'].fillna(0).clip(lower=0)
+
+    return categorize_filter_columns(df)
+
+def stringify_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Arrow needs one type per column, but object columns mixing numbers and
+    # text (e.g. 5 and 'red') are routine from read_excel and chunked parsing;
+    # their values become str, missing values stay missing
+    object_cols = df.select_dtypes(include='object').columns
+    kinds = map_columns(lambda s: pd.api.types.infer_dtype(s, skipna=True), df, object_cols)
+    for c, kind in kinds.items():
+        if kind in ('mixed', 'mixed-integer'):
+            df[c] = df[c].where(df[c].isna(), df[c].astype(str))
+    return df
 
+def categorize_filter_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Low-cardinality string filter columns become categoricals: 1-4 byte codes
+    # per row instead of Python strings, and isin compares integer codes.
+    # Mixed columns are made uniform first so the categories are too
+    df = stringify_mixed_columns(df)
+    text_cols = set(df.select_dtypes(include=['object', 'string']).columns)
+    max_categories = max(1000, len(df) // 50)
+    candidates = [c for c in get_dynamic_filter_columns(df) if c in text_cols]
+    for c, n in map_columns(lambda s: s.nunique(dropna=True), df, candidates).items():
+        if n <= max_categories:
+            df[c] = df[c].astype('category')
     return df
 
+def read_csv_chunked(data: bytes) -> pd.DataFrame:
+    # Clean each chunk as it is parsed so the raw (all-object) frame never
+    # exists in full alongside the cleaned one
+    def prepared_chunks(encoding):
+        reader = pd.read_csv(io.BytesIO(data), chunksize=CSV_CHUNK_ROWS, encoding=encoding)
+        return [coerce_and_prepare(normalize_columns(chunk)) for chunk in reader]
+    try:
+        chunks = prepared_chunks('utf-8')
+    except UnicodeDecodeError:
+        chunks = prepared_chunks('latin-1')
+    # chunks carry different category sets, which concat falls back to object
+    return categorize_filter_columns(pd.concat(chunks, ignore_index=True))
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    # Parquet keeps dtypes and compresses column-wise, so the cached payload is
+    # much smaller and cheaper to decode than orient='split' JSON
+    buf = io.BytesIO()
+    df.to_parquet(buf, compression='zstd')
+    return buf.getvalue()
+
+def decode_frame(data: bytes) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(data))
+
+def csv_bytes(df: pd.DataFrame) -> bytes:
+    # Arrow's writer encodes straight into one buffer: no intermediate str copy
+    buf = io.BytesIO()
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # a column Arrow can't type (e.g. mixed numbers and text): pandas' writer
+        df.to_csv(buf, index=False)
+        return buf.getvalue()
+    pacsv.write_csv(table, buf, pacsv.WriteOptions(quoting_style='needed'))
+    return buf.getvalue()
+
+def load_frame(data_key):
+    # None when the entry expired or was never stored
+    data = cache.get(data_key)
+    return decode_frame(data) if data is not None else None
+
+def filters_cache_key(filter_values: dict) -> tuple:
+    # Hashable, order-independent form of the active filters
+    items = []
+    for col, val in sorted(filter_values.items()):
+        if val is None or val == [] or (isinstance(val, str) and val.strip() == ""):
+            continue
+        items.append((col, tuple(val) if isinstance(val, list) else val))
+    return tuple(items)
+
+def derivative_key(name, data_key, filter_key=()):
+    digest = hashlib.sha1(repr(filter_key).encode()).hexdigest()
+    return f"{name}:{data_key}:{digest}"
+
+def cached_derivative(name, data_key, filter_key, build):
+    # Memoize an expensive view derivative on (dataset, filters)
+    entry_key = derivative_key(name, data_key, filter_key)
+    value = cache.get(entry_key)
+    if value is None:
+        value = build()
+        cache.set(entry_key, value)
+    return value
+
+def numeric_columns(df: pd.DataFrame) -> list:
+    # filtering only drops rows, so the numeric subset is fixed per upload
+    return df.select_dtypes(include='number').columns.tolist()
+
 def compute_overview(df: pd.DataFrame) -> dict:
     overview = {}
     overview['total_products'] = int(len(df))
-    overview['avg_price'] = round(float(df['current_price'].dropna().mean()), 2) if not df['current_price'].dropna().empty else None
-    overview['median_price'] = round(float(df['current_price'].dropna().median()), 2) if not df['current_price'].dropna().empty else None
-    overview['avg_rating'] = round(float(df['rating'].dropna().mean()), 2) if 'rating' in df.columns and not df['rating'].dropna().empty else None
-    overview['missing_values_pct'] = round(df.isna().mean().mean() * 100, 2)
+    # one float64 snapshot of each column instead of repeated dropna() copies
+    price = df['current_price'].to_numpy(dtype=np.float64, na_value=np.nan)
+    price = price[~np.isnan(price)]
+    overview['avg_price'] = round(float(price.mean()), 2) if price.size else None
+    overview['median_price'] = round(float(np.median(price)), 2) if price.size else None
+    rating = df['rating'].to_numpy(dtype=np.float64, na_value=np.nan) if 'rating' in df.columns else np.empty(0)
+    rating = rating[~np.isnan(rating)]
+    overview['avg_rating'] = round(float(rating.mean()), 2) if rating.size else None
+    overview['missing_values_pct'] = round(float(df.isna().to_numpy().mean()) * 100, 2) if df.size else 0.0
     overview['num_numeric'] = int(len(df.select_dtypes(include='number').columns))
     overview['num_categorical'] = int(len(df.select_dtypes(exclude='number').columns))
     return overview
@@ -77,32 +254,122 @@ def get_dynamic_filter_columns(df: pd.DataFrame):
     # All columns except FIXED are treated as filters (except any url)
     return [c for c in df.columns if c not in FIXED]
 
-def detect_anomalies_iqr(series: pd.Series):
-    # return boolean mask of anomalies using IQR
-    if series.dropna().empty:
-        return pd.Series([False]*len(series), index=series.index)
-    q1 = series.quantile(0.25)
-    q3 = series.quantile(0.75)
+def compute_filter_options(df: pd.DataFrame) -> dict:
+    # Sorted dropdown values per filter column (limit to 100 options); None
+    # means the column has too many values and gets a text search instead
+    options = {}
+    uniques = map_columns(lambda s: s.dropna().unique(), df, get_dynamic_filter_columns(df))
+    for c, vals in uniques.items():
+        options[c] = sorted(vals.tolist(), key=str) if len(vals) <= 100 else None
+    return options
+
+@njit(cache=True)
+def _iqr_mask(arr):
+    # q1/q3 with pandas' linear interpolation from a single partial sort, then
+    # the outlier mask in one loop (NaN never counts as an anomaly)
+    out = np.zeros(arr.size, dtype=np.bool_)
+    valid = arr[~np.isnan(arr)]
+    n = valid.size
+    if n == 0:
+        return out
+    pos1 = 0.25 * (n - 1)
+    pos3 = 0.75 * (n - 1)
+    lo1 = int(pos1)
+    lo3 = int(pos3)
+    hi1 = min(lo1 + 1, n - 1)
+    hi3 = min(lo3 + 1, n - 1)
+    part = np.partition(valid, np.array([lo1, hi1, lo3, hi3]))
+    q1 = part[lo1] + (part[hi1] - part[lo1]) * (pos1 - lo1)
+    q3 = part[lo3] + (part[hi3] - part[lo3]) * (pos3 - lo3)
     iqr = q3 - q1
     lower = q1 - 1.5 * iqr
     upper = q3 + 1.5 * iqr
-    return (series < lower) | (series > upper)
+    for i in range(arr.size):
+        out[i] = arr[i] < lower or arr[i] > upper
+    return out
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: pick `threshold` rows that preserve the
+    # visual shape of (x, y). x must be sorted ascending.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    idx = np.empty(threshold, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    # threshold-2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def histogram_figure(values: np.ndarray, bins, title: str, x_label: str, rug: bool = False) -> go.Figure:
+    # Bin on the server so only bar heights cross the wire, not every row
+    values = values[~np.isnan(values)]
+    fig = go.Figure()
+    if values.size:
+        counts, edges = np.histogram(values, bins=bins)
+        fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), showlegend=False))
+        if rug:
+            # marginal rug strip above the bars; evenly spaced order statistics
+            # keep its density when there are too many values to draw
+            rug_x = np.sort(values)
+            if rug_x.size > MAX_RUG_POINTS:
+                rug_x = rug_x[np.linspace(0, rug_x.size - 1, MAX_RUG_POINTS).astype(np.int64)]
+            fig.add_trace(go.Scattergl(x=rug_x, y=np.zeros(rug_x.size), mode='markers', yaxis='y2',
+                                       marker={'symbol': 'line-ns-open', 'size': 10}, showlegend=False,
+                                       hovertemplate=f'{x_label}=%{{x}}<extra></extra>'))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count', bargap=0, height=350)
+    if rug:
+        fig.update_layout(yaxis={'domain': [0, 0.8]},
+                          yaxis2={'domain': [0.82, 1], 'showticklabels': False, 'showgrid': False, 'zeroline': False})
+    return fig
+
+# Histogram bin counts per column; edges come from the full upload so the
+# x-axis stays put while filters change
+HIST_BINS = {'current_price': 30, 'rating': 20}
+
+def histogram_edges(df: pd.DataFrame) -> dict:
+    edges = {}
+    for col, bins in HIST_BINS.items():
+        values = df[col].dropna().to_numpy(dtype=float)
+        edges[col] = np.histogram_bin_edges(values, bins=bins) if values.size else bins
+    return edges
+
+def data_patch(fig: go.Figure) -> dash.Patch:
+    # Replace only the traces; the layout (title, axes, ~7 KB of template) is
+    # already in the browser and doesn't change with the filters
+    patch = dash.Patch()
+    patch['data'] = [trace.to_plotly_json() for trace in fig.data]
+    return patch
+
+def correlation_matrix(num_df: pd.DataFrame) -> np.ndarray:
+    # Mean-impute NaNs once, standardize a float32 copy and let BLAS (sgemm)
+    # do X.T @ X, instead of pandas' pairwise NaN-aware column loop
+    X = num_df.fillna(num_df.mean()).to_numpy(dtype=np.float32)
+    X -= X.mean(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        X /= X.std(axis=0)
+    return (X.T @ X) / X.shape[0]
 
 def summarize_numeric(df: pd.DataFrame, numeric_cols):
-    rows = []
-    for c in numeric_cols:
-        s = df[c].dropna()
-        rows.append({
-            'column': c,
-            'count': int(s.count()),
-            'mean': float(s.mean()) if not s.empty else None,
-            'median': float(s.median()) if not s.empty else None,
-            'std': float(s.std()) if not s.empty else None,
-            'min': float(s.min()) if not s.empty else None,
-            'max': float(s.max()) if not s.empty else None,
-            'missing': int(df[c].isna().sum())
-        })
-    return rows
+    if not numeric_cols:
+        return []
+    # One agg call runs each reduction through pandas' C kernels (NaN skipped)
+    # instead of a Python loop doing dropna + 7 reductions per column
+    summary = df[numeric_cols].agg(['count', 'mean', 'median', 'std', 'min', 'max']).T
+    summary['missing'] = df[numeric_cols].isna().sum()
+    summary = summary.astype(object).where(summary.notna(), None)
+    summary['count'] = summary['count'].astype(int)
+    summary['missing'] = summary['missing'].astype(int)
+    summary.insert(0, 'column', summary.index)
+    return summary.to_dict('records')
 
 # ---------- Layout ----------
 app.layout = dbc.Container([
@@ -138,8 +405,13 @@ app.layout = dbc.Container([
         )
     ]),
 
-    # Store
+    # Store (content key into the server-side cache)
     dcc.Store(id='stored-data', storage_type='session'),
+    # Small stat dicts rendered into KPI cards / suggestions clientside
+    dcc.Store(id='kpi-stats'),
+    dcc.Store(id='suggestion-stats'),
+    # data_key whose full figures (layout included) the browser is showing
+    dcc.Store(id='rendered-key'),
 
     # Controls and filters
     dbc.Card([
@@ -268,9 +540,12 @@ app.layout = dbc.Container([
             html.H5("Data Preview (filtered)", className="card-title"),
             dash_table.DataTable(
                 id='data-preview',
+                page_action='custom',
+                page_current=0,
                 page_size=15,
-                filter_action='native',
-                sort_action='native',
+                filter_action='custom',
+                sort_action='custom',
+                sort_mode='single',
                 column_selectable='single',
                 row_selectable='multi',
                 style_table={'overflowX':'auto'}
@@ -295,49 +570,62 @@ def handle_upload(contents, filename):
         return dash.no_update, ""
     content_type, content_string = contents.split(',')
     decoded = base64.b64decode(content_string)
+    is_excel = bool(filename) and filename.lower().endswith(('.xls', '.xlsx'))
+    # key on the raw bytes (and parser); a repeat upload skips parsing entirely
+    digest = hashlib.blake2b(decoded, digest_size=16)
+    digest.update(b'excel' if is_excel else b'csv')
+    data_key = digest.hexdigest()
+    if cache.has(data_key):
+        return data_key, html.Div([html.B("Uploaded: "), filename])
+
+    chunked = not is_excel and len(decoded) > LARGE_UPLOAD_BYTES
     try:
         # try as excel first if filename suggests it
-        if filename and filename.lower().endswith(('.xls', '.xlsx')):
+        if is_excel:
             df = pd.read_excel(io.BytesIO(decoded))
+        elif chunked:
+            # large csv: already normalized and cleaned per chunk
+            df = read_csv_chunked(decoded)
         else:
-            # csv fallback (handles various encodings safely)
-            df = pd.read_csv(io.StringIO(decoded.decode('utf-8')), low_memory=False)
+            # csv fallback (utf-8, then latin-1)
+            df = read_csv_bytes(decoded)
     except Exception as e:
-        # second attempt with latin-1
-        try:
-            df = pd.read_csv(io.StringIO(decoded.decode('latin-1')), low_memory=False)
-        except Exception as e2:
-            return dash.no_update, f"Error reading file: {e} / {e2}"
+        return dash.no_update, f"Error reading file: {e}"
+    # release the raw upload before building the cleaned frame
+    del decoded
 
-    df = normalize_columns(df)
-    df = coerce_and_prepare(df)
+    if not chunked:
+        df = normalize_columns(df)
+        df = coerce_and_prepare(df)
 
-    # store minimal JSON (orient records) + meta
-    data_json = df.to_json(date_format='iso', orient='split')
-    return data_json, html.Div([html.B("Uploaded: "), filename])
+    # cache compact Parquet bytes server-side; only the key goes to the browser
+    cache.set(derivative_key('options', data_key), compute_filter_options(df))
+    cache.set(derivative_key('numeric_cols', data_key), numeric_columns(df))
+    cache.set(derivative_key('hist_edges', data_key), histogram_edges(df))
+    cache.set(data_key, encode_frame(df), timeout=DATASET_TIMEOUT)
+    return data_key, html.Div([html.B("Uploaded: "), filename])
 
 @app.callback(
     Output('controls-area', 'children'),
-    Output('kpi-area', 'children'),
+    Output('kpi-stats', 'data'),
     Input('stored-data', 'data')
 )
-def build_controls_and_kpis(data_json):
-    if not data_json:
-        return [], []
-    df = pd.read_json(data_json, orient='split')
-    # dynamic filters: unique values for non-fixed columns (limit to 100 options)
-    filter_cols = get_dynamic_filter_columns(df)
+def build_controls_and_kpis(data_key):
+    if not data_key or not cache.has(data_key):
+        return [], None
+    # dynamic filters: option lists are computed once at upload; the frame is
+    # only loaded again if a cache entry went missing
+    filter_options = cached_derivative('options', data_key, (), lambda: compute_filter_options(load_frame(data_key)))
     controls = []
-    for c in filter_cols:
-        vals = df[c].dropna().unique()
+    for c, vals in filter_options.items():
         # For large unique cardinality, provide a text search input instead of multi-select
-        if len(vals) <= 100:
+        if vals is not None:
             controls.append(
                 html.Div([
                     html.Label(c),
                     dcc.Dropdown(
                         id={'type':'dyn-filter','col':c},
-                        options=[{'label':str(v),'value':v} for v in sorted(vals, key=lambda x: str(x))],
+                        options=[{'label':str(v),'value':v} for v in vals],
                         multi=True,
                         placeholder=f"Filter by {c}"
                     )
@@ -351,80 +639,96 @@ def build_controls_and_kpis(data_json):
                 ], style={'minWidth':'200px','maxWidth':'300px'})
             )
 
-    # KPIs
-    overview = compute_overview(df)
-    kpis = []
-    kpis.append(
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    html.H6("Total Products", className="card-subtitle mb-2 text-muted"),
-                    html.H3(f"{overview['total_products']}", className="card-title"),
-                ])
-            ], color="light", inverse=False, className="h-100"),
-            width="auto"
-        )
-    )
-    kpis.append(
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    html.H6("Avg Price", className="card-subtitle mb-2 text-muted"),
-                    html.H3(f"{overview['avg_price'] if overview['avg_price'] is not None else 'N/A'}", className="card-title"),
-                ])
-            ], color="light", inverse=False, className="h-100"),
-            width="auto"
-        )
-    )
-    kpis.append(
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    html.H6("Median Price", className="card-subtitle mb-2 text-muted"),
-                    html.H3(f"{overview['median_price'] if overview['median_price'] is not None else 'N/A'}", className="card-title"),
-                ])
-            ], color="light", inverse=False, className="h-100"),
-            width="auto"
-        )
-    )
-    kpis.append(
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    html.H6("Avg Rating", className="card-subtitle mb-2 text-muted"),
-                    html.H3(f"{overview['avg_rating'] if overview['avg_rating'] is not None else 'N/A'}", className="card-title"),
-                ])
-            ], color="light", inverse=False, className="h-100"),
-            width="auto"
-        )
-    )
-    kpis.append(
-        dbc.Col(
-            dbc.Card([
-                dbc.CardBody([
-                    html.H6("Missing % (all cols)", className="card-subtitle mb-2 text-muted"),
-                    html.H3(f"{overview['missing_values_pct']}%", className="card-title"),
-                ])
-            ], color="light", inverse=False, className="h-100"),
-            width="auto"
-        )
-    )
-    return controls, kpis
+    # KPIs: only the numbers go to the browser, cards are rendered clientside
+    overview = cached_derivative('overview', data_key, (), lambda: compute_overview(load_frame(data_key)))
+    return controls, overview
+
+# KPI cards and suggestion bullets are pure formatting of small stat dicts, so
+# they are built in the browser instead of on every server round-trip.
+app.clientside_callback(
+    """
+    function(overview) {
+        if (!overview) { return []; }
+        const fmt = (v) => (v === null || v === undefined) ? 'N/A' : String(v);
+        const cards = [
+            ['Total Products', fmt(overview.total_products)],
+            ['Avg Price', fmt(overview.avg_price)],
+            ['Median Price', fmt(overview.median_price)],
+            ['Avg Rating', fmt(overview.avg_rating)],
+            ['Missing % (all cols)', fmt(overview.missing_values_pct) + '%'],
+        ];
+        return cards.map(([label, value]) => ({
+            namespace: 'dash_bootstrap_components', type: 'Col',
+            props: {width: 'auto', children: {
+                namespace: 'dash_bootstrap_components', type: 'Card',
+                props: {color: 'light', inverse: false, className: 'h-100', children: {
+                    namespace: 'dash_bootstrap_components', type: 'CardBody',
+                    props: {children: [
+                        {namespace: 'dash_html_components', type: 'H6',
+                         props: {children: label, className: 'card-subtitle mb-2 text-muted'}},
+                        {namespace: 'dash_html_components', type: 'H3',
+                         props: {children: value, className: 'card-title'}},
+                    ]}
+                }}
+            }}
+        }));
+    }
+    """,
+    Output('kpi-area', 'children'),
+    Input('kpi-stats', 'data')
+)
+
+app.clientside_callback(
+    """
+    function(stats) {
+        if (!stats) { return []; }
+        const items = [];
+        if (stats.avg_discount !== null && stats.avg_discount < 5) {
+            items.push('Average discount is low (<5%). Consider promotions or price checks.');
+        }
+        if (stats.avg_rating !== null && stats.avg_rating < 3.8) {
+            items.push('Average rating below 3.8: investigate listings or product quality.');
+        }
+        if (stats.n_anomalies > 0) {
+            items.push(`Found ${stats.n_anomalies} price anomalies (IQR). Inspect these rows in the table.`);
+        }
+        if (!items.length) {
+            items.push('No immediate issues detected.');
+        }
+        return items.map((text) => ({namespace: 'dash_html_components', type: 'Li', props: {children: text}}));
+    }
+    """,
+    Output('suggestions-list', 'children'),
+    Input('suggestion-stats', 'data')
+)
+
+def collect_filters(multi_vals, text_vals, multi_ids, text_ids) -> dict:
+    # Build filter dict: map ids to values
+    filter_values = {}
+    if multi_ids and multi_vals:
+        for ident, val in zip(multi_ids, multi_vals):
+            filter_values[ident['col']] = val
+    if text_ids and text_vals:
+        for ident, val in zip(text_ids, text_vals):
+            filter_values[ident['col']] = val
+    return filter_values
 
 def apply_filters(df: pd.DataFrame, filter_values: dict):
     # filter_values keys are column names; values are either list (multiselect) or text search
-    df2 = df.copy()
+    # Combine every filter into one boolean mask and index the frame once
+    mask = np.ones(len(df), dtype=bool)
     for col, val in filter_values.items():
         if val is None or val == [] or (isinstance(val, str) and val.strip() == ""):
             continue
         if isinstance(val, list):
             # allow matching any of the selected items
-            df2 = df2[df2[col].isin(val)]
+            mask &= df[col].isin(val).to_numpy()
         else:
-            # substring case-insensitive match
-            mask = df2[col].astype(str).str.contains(str(val), case=False, na=False)
-            df2 = df2[mask]
-    return df2
+            # substring case-insensitive match (literal, not regex)
+            mask &= df[col].astype(str).str.contains(str(val), case=False, na=False, regex=False).to_numpy()
+    if mask.all():
+        return df
+    return df.loc[mask]
 
 @app.callback(
     Output('price-dist', 'figure'),
@@ -435,95 +739,187 @@ def apply_filters(df: pd.DataFrame, filter_values: dict):
     Output('numeric-summary', 'data'),
     Output('top-discounted', 'data'),
     Output('top-rated', 'data'),
-    Output('suggestions-list', 'children'),
-    Output('data-preview', 'columns'),
-    Output('data-preview', 'data'),
+    Output('suggestion-stats', 'data'),
+    Output('file-name', 'children', allow_duplicate=True),
+    Output('rendered-key', 'data'),
     Input('stored-data', 'data'),
     Input({'type':'dyn-filter','col':dash.ALL}, 'value'),
     Input({'type':'dyn-filter-text','col':dash.ALL}, 'value'),
     State({'type':'dyn-filter','col':dash.ALL}, 'id'),
     State({'type':'dyn-filter-text','col':dash.ALL}, 'id'),
+    State('rendered-key', 'data'),
+    prevent_initial_call='initial_duplicate'
 )
-def refresh_visuals(data_json, multi_vals, text_vals, multi_ids, text_ids):
-    if not data_json:
+def refresh_visuals(data_key, multi_vals, text_vals, multi_ids, text_ids, rendered_key):
+    df = load_frame(data_key) if data_key else None
+    if df is None:
         empty_fig = go.Figure()
-        return empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, [], [], [], [], [], []
+        # the browser still holds a key whose dataset left the cache
+        status = "Data expired, please re-upload the file." if data_key else dash.no_update
+        return empty_fig, empty_fig, empty_fig, empty_fig, empty_fig, [], [], [], None, status, None
 
-    df = pd.read_json(data_json, orient='split')
+    filter_values = collect_filters(multi_vals, text_vals, multi_ids, text_ids)
+    df_filtered = apply_filters(df, filter_values)
+    filter_key = filters_cache_key(filter_values)
 
-    # Build filter dict: map ids to values
-    filter_values = {}
-    if multi_ids and multi_vals:
-        for ident, val in zip(multi_ids, multi_vals):
-            filter_values[ident['col']] = val
-    if text_ids and text_vals:
-        for ident, val in zip(text_ids, text_vals):
-            filter_values[ident['col']] = val
+    edges = cached_derivative('hist_edges', data_key, (), lambda: histogram_edges(df))
 
-    df_filtered = apply_filters(df, filter_values)
+    # one float64 snapshot per hot column (all FIXED columns exist after
+    # coerce_and_prepare), shared by every figure and stat below
+    cp = df_filtered['current_price'].to_numpy(dtype=np.float64, na_value=np.nan)
+    rt = df_filtered['rating'].to_numpy(dtype=np.float64, na_value=np.nan)
+    rv = df_filtered['review'].to_numpy(dtype=np.float64, na_value=np.nan)
+    dc = df_filtered['discount'].to_numpy(dtype=np.float64, na_value=np.nan)
 
     # Price distribution
-    fig_price = px.histogram(df_filtered, x='current_price', nbins=30, title="Price Distribution", marginal="rug")
-    fig_price.update_layout(height=350)
+    fig_price = histogram_figure(cp, edges['current_price'], "Price Distribution", 'current_price', rug=True)
 
     # Rating distribution
-    fig_rating = px.histogram(df_filtered, x='rating', nbins=20, title="Rating Distribution")
-    fig_rating.update_layout(height=350)
-
-    # Price vs rating scatter
-    fig_scatter = px.scatter(df_filtered, x='current_price', y='rating', hover_data=['title'], title='Price vs Rating (size by review)')
-    if 'review' in df_filtered.columns:
-        fig_scatter.update_traces(marker=dict(size=np.clip((df_filtered['review'].fillna(0).astype(float) / (df_filtered['review'].max() if df_filtered['review'].max()!=0 else 1))*12, 6, 30)))
-    fig_scatter.update_layout(height=350)
+    fig_rating = histogram_figure(rt, edges['rating'], "Rating Distribution", 'rating')
+
+    # Price vs rating scatter (WebGL, decimated with LTTB on large frames)
+    idx = np.flatnonzero(~(np.isnan(cp) | np.isnan(rt)))
+    if idx.size > MAX_SCATTER_POINTS:
+        idx = idx[np.argsort(cp[idx], kind='stable')]
+        idx = idx[lttb_indices(cp[idx], rt[idx], MAX_SCATTER_POINTS)]
+    # translucent markers keep dense regions readable in the WebGL trace
+    marker = {'opacity': 0.6}
+    review_max = np.nanmax(rv) if not np.isnan(rv).all() else 0
+    marker['size'] = np.clip(np.nan_to_num(rv[idx]) / (review_max if review_max != 0 else 1) * 12, 6, 30)
+    fig_scatter = go.Figure(go.Scattergl(x=cp[idx], y=rt[idx], mode='markers',
+                                         marker=marker, text=df_filtered['title'].to_numpy()[idx],
+                                         hovertemplate='%{text}<br>price=%{x}<br>rating=%{y}<extra></extra>'))
+    fig_scatter.update_layout(title='Price vs Rating (size by review)', xaxis_title='current_price',
+                              yaxis_title='rating', height=350)
 
     # Correlation heatmap
-    num_df = df_filtered.select_dtypes(include='number')
+    numeric_cols = cached_derivative('numeric_cols', data_key, (), lambda: numeric_columns(df))
+    num_df = df_filtered[numeric_cols]
     if not num_df.empty and num_df.shape[1] >= 2:
-        corr = num_df.corr()
-        heatmap = go.Figure(data=go.Heatmap(z=corr.values, x=corr.columns, y=corr.columns, colorscale='Viridis'))
+        corr = cached_derivative('corr', data_key, filter_key, lambda: correlation_matrix(num_df))
+        heatmap = go.Figure(data=go.Heatmap(z=corr, x=num_df.columns, y=num_df.columns, colorscale='Viridis'))
         heatmap.update_layout(title='Numeric Correlation', height=350)
     else:
         heatmap = go.Figure()
 
-    # Missing data heatmap (binary)
-    miss = df_filtered.isna().astype(int)
-    if not miss.empty:
-        miss_fig = go.Figure(data=go.Heatmap(z=miss.T.values, x=miss.index, y=miss.columns, colorscale=[[0, 'white'], [1, 'red']], showscale=False))
+    # Missing data heatmap (binary): 1 byte per cell, transposed as a view.
+    # Not cached: isna is cheaper than pickling the N x M matrix to disk
+    miss = df_filtered.isna().to_numpy().view(np.uint8)
+    if miss.size:
+        step = max(1, math.ceil(miss.shape[0] / MAX_HEATMAP_ROWS))
+        miss_fig = go.Figure(data=go.Heatmap(z=miss[::step].T, x=df_filtered.index[::step], y=df_filtered.columns, colorscale=[[0, 'white'], [1, 'red']], showscale=False))
         miss_fig.update_layout(title='Missing Data Heatmap (red = missing)', height=250)
     else:
         miss_fig = go.Figure()
 
     # Numeric summary table
-    numeric_cols = num_df.columns.tolist()
-    numeric_summary_rows = summarize_numeric(df_filtered, numeric_cols)
+    numeric_summary_rows = cached_derivative('summary', data_key, filter_key,
+                                             lambda: summarize_numeric(df_filtered, numeric_cols))
 
     # Top discounted / Top rated
-    top_disc = df_filtered.sort_values(by='discount', ascending=False).head(50)[['title','mrp','current_price','discount']].to_dict('records') if 'discount' in df_filtered.columns else []
-    top_rated = df_filtered.sort_values(by='rating', ascending=False).head(50)[['title','rating','review']].to_dict('records') if 'rating' in df_filtered.columns else []
-
-    # Suggestions (rules-based)
-    suggestions = []
-    if 'discount' in df_filtered.columns and not df_filtered['discount'].dropna().empty:
-        if df_filtered['discount'].mean() < 5:
-            suggestions.append(html.Li("Average discount is low (<5%). Consider promotions or price checks."))
-    if 'rating' in df_filtered.columns and not df_filtered['rating'].dropna().empty:
-        if df_filtered['rating'].mean() < 3.8:
-            suggestions.append(html.Li("Average rating below 3.8: investigate listings or product quality."))
+    # nlargest does an O(N) partial selection instead of a full sort
+    top_disc = df_filtered.nlargest(50, 'discount')[['title','mrp','current_price','discount']].to_dict('records') if 'discount' in df_filtered.columns else []
+    top_rated = df_filtered.nlargest(50, 'rating')[['title','rating','review']].to_dict('records') if 'rating' in df_filtered.columns else []
+
+    # Suggestion inputs (rules are applied clientside)
+    suggestion_stats = {'avg_discount': None, 'avg_rating': None, 'n_anomalies': 0}
+    if not np.isnan(dc).all():
+        suggestion_stats['avg_discount'] = float(np.nanmean(dc))
+    if not np.isnan(rt).all():
+        suggestion_stats['avg_rating'] = float(np.nanmean(rt))
     # Anomaly detection example for current_price
-    if 'current_price' in df_filtered.columns and not df_filtered['current_price'].dropna().empty:
-        anomalies_mask = detect_anomalies_iqr(df_filtered['current_price'])
-        n_anom = int(anomalies_mask.sum())
-        if n_anom > 0:
-            suggestions.append(html.Li(f"Found {n_anom} price anomalies (IQR). Inspect these rows in the table."))
-    if not suggestions:
-        suggestions = [html.Li("No immediate issues detected.")]
-
-    # Data preview columns & data (limit to 200 rows returned)
-    preview_df = df_filtered.head(200)
-    columns = [{'name': c, 'id': c} for c in preview_df.columns]
-    data_records = preview_df.to_dict('records')
+    if not np.isnan(cp).all():
+        suggestion_stats['n_anomalies'] = int(_iqr_mask(cp).sum())
+
+    figures = [fig_price, fig_rating, fig_scatter, heatmap, miss_fig]
+    if rendered_key == data_key:
+        # the browser already shows this dataset's full figures (a superseded
+        # full render never lands here), so only the traces are sent
+        figures = [data_patch(fig) for fig in figures]
+        rendered_key = dash.no_update
+    else:
+        rendered_key = data_key
+    return (*figures, numeric_summary_rows, top_disc, top_rated, suggestion_stats, dash.no_update, rendered_key)
+
+# DataTable filter_query operators, each with the symbol forms the UI also emits
+TABLE_FILTER_OPERATORS = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'],
+                          ['ne ', '!='], ['eq ', '='], ['contains '], ['datestartswith ']]
+
+def split_filter_part(filter_part):
+    # "{col} op value" -> (col, op, value); quoted values stay str, bare
+    # numbers become float
+    for operator_type in TABLE_FILTER_OPERATORS:
+        for operator in operator_type:
+            if operator in filter_part:
+                name_part, value_part = filter_part.split(operator, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value_part = value_part.strip()
+                if len(value_part) >= 2 and value_part[0] == value_part[-1] and value_part[0] in ("'", '"', '`'):
+                    value = value_part[1:-1].replace('\\' + value_part[0], value_part[0])
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+def apply_table_filter(df: pd.DataFrame, filter_query: str) -> pd.DataFrame:
+    # The preview's own column filters, applied to its (small) row set
+    for part in filter_query.split(' && '):
+        col, op, value = split_filter_part(part)
+        if col not in df.columns:
+            continue
+        if op == 'contains':
+            mask = df[col].astype(str).str.contains(str(value), case=False, na=False, regex=False)
+        elif op == 'datestartswith':
+            mask = df[col].astype(str).str.startswith(str(value), na=False)
+        elif isinstance(value, float):
+            mask = getattr(pd.to_numeric(df[col], errors='coerce'), op)(value)
+        else:
+            mask = getattr(df[col].astype(str), op)(value)
+        df = df.loc[mask.to_numpy()]
+    return df
+
+def filtered_preview(data_key, filter_values):
+    # First PREVIEW_ROWS rows of the filtered frame, shared by paging and download
+    def build():
+        df = load_frame(data_key)
+        return None if df is None else apply_filters(df, filter_values).head(PREVIEW_ROWS)
+    return cached_derivative('preview', data_key, filters_cache_key(filter_values), build)
 
-    return fig_price, fig_rating, fig_scatter, heatmap, miss_fig, numeric_summary_rows, top_disc, top_rated, suggestions, columns, data_records
+# Data preview: only the requested page is serialized to the browser
+@app.callback(
+    Output('data-preview', 'columns'),
+    Output('data-preview', 'data'),
+    Output('data-preview', 'page_count'),
+    Output('data-preview', 'page_current'),
+    Input('data-preview', 'page_current'),
+    Input('data-preview', 'page_size'),
+    Input('data-preview', 'sort_by'),
+    Input('data-preview', 'filter_query'),
+    Input('stored-data', 'data'),
+    Input({'type':'dyn-filter','col':dash.ALL}, 'value'),
+    Input({'type':'dyn-filter-text','col':dash.ALL}, 'value'),
+    State({'type':'dyn-filter','col':dash.ALL}, 'id'),
+    State({'type':'dyn-filter-text','col':dash.ALL}, 'id'),
+)
+def page_preview(page_current, page_size, sort_by, filter_query, data_key, multi_vals, text_vals, multi_ids, text_ids):
+    preview_df = filtered_preview(data_key, collect_filters(multi_vals, text_vals, multi_ids, text_ids)) if data_key else None
+    if preview_df is None:
+        return [], [], 1, 0
+    # new data or filters start again from the first page
+    if dash.ctx.triggered_id not in ('data-preview', None) or 'data-preview.filter_query' in dash.ctx.triggered_prop_ids:
+        page_current = 0
+    if filter_query:
+        preview_df = apply_table_filter(preview_df, filter_query)
+    if sort_by:
+        preview_df = preview_df.sort_values(sort_by[0]['column_id'], ascending=sort_by[0]['direction'] == 'asc')
+    page_current = page_current or 0
+    start = page_current * page_size
+    columns = [{'name': c, 'id': c} for c in preview_df.columns]
+    page_count = max(1, math.ceil(len(preview_df) / page_size))
+    return columns, preview_df.iloc[start:start + page_size].to_dict('records'), page_count, page_current
 
 # Downloads: cleaned (original cleaned) and filtered
 @app.callback(
@@ -532,24 +928,28 @@ def refresh_visuals(data_json, multi_vals, text_vals, multi_ids, text_ids):
     State('stored-data', 'data'),
     prevent_initial_call=True
 )
-def download_cleaned(n, data_json):
-    if not data_json:
+def download_cleaned(n, data_key):
+    if not data_key or not cache.has(data_key):
         return dash.no_update
-    df = pd.read_json(data_json, orient='split')
-    return dcc.send_data_frame(df.to_csv, "insightify_cleaned.csv", index=False)
+    # built once per upload; repeat clicks reuse the cached bytes
+    data = cached_derivative('csv', data_key, (), lambda: csv_bytes(load_frame(data_key)))
+    return dcc.send_bytes(data, "insightify_cleaned.csv")
 
 @app.callback(
     Output('download-filtered-file', 'data'),
     Input('download-filtered', 'n_clicks'),
-    State('data-preview', 'data'),
-    State('data-preview', 'columns'),
+    State('stored-data', 'data'),
+    State({'type':'dyn-filter','col':dash.ALL}, 'value'),
+    State({'type':'dyn-filter-text','col':dash.ALL}, 'value'),
+    State({'type':'dyn-filter','col':dash.ALL}, 'id'),
+    State({'type':'dyn-filter-text','col':dash.ALL}, 'id'),
     prevent_initial_call=True
 )
-def download_filtered(n, preview_data, preview_cols):
-    if not preview_data:
+def download_filtered(n, data_key, multi_vals, text_vals, multi_ids, text_ids):
+    df = filtered_preview(data_key, collect_filters(multi_vals, text_vals, multi_ids, text_ids)) if data_key else None
+    if df is None or df.empty:
         return dash.no_update
-    df = pd.DataFrame(preview_data)
-    return dcc.send_data_frame(df.to_csv, "insightify_filtered_preview.csv", index=False)
+    return dcc.send_bytes(csv_bytes(df), "insightify_filtered_preview.csv")
 
 # Run
 if __name__ == "__main__":
@@ -3,13 +3,91 @@ from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 from urllib.parse import urljoin, urlparse, parse_qs, unquote
 import csv
+import hashlib
+import importlib.util
+import itertools
+import os
 import re
 import random
 import time
-from collections import defaultdict
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+import orjson
+
+# Patterns used on every product; compiled once at import
+NON_PRICE_RE = re.compile(r'[^\d.]')
+NON_DIGIT_RE = re.compile(r'[^\d]')
+RATING_RE = re.compile(r'(\d+\.\d+)')
+COUNT_RE = re.compile(r'[\d,]+')
+# Product ID in /dp/ and /gp/product/ URLs; colour and size variants differ here
+ASIN_RE = re.compile(r'/(?:dp|gp/product)/([A-Z0-9]{10})')
+# Search-context query params on product links; variant selectors such as
+# th and psc pick a different SKU and are kept
+TRACKING_PARAMS = frozenset(['ref', 'ref_', 'qid', 'sr', 'crid', 'sprefix', 'dib', 'dib_tag', 'keywords'])
+# Currency symbols, separators and whitespace seen in price strings
+PRICE_STRIP = str.maketrans('', '', '₹$€£, \t\n\xa0')
+
+# Joins a spec key and value in one XPath string result; a private-use
+# character, since lxml rejects control characters in expressions
+SPEC_SEP = '\ue000'
+
+@lru_cache(maxsize=4096)
+def collapse_whitespace(text):
+    # Spec keys and values repeat across a query's products, so most calls hit the cache
+    return ' '.join(text.split())
+
+def has_class(name):
+    # XPath equivalent of the CSS `.name` class selector
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+class RotatingHeadersMiddleware:
+    """Apply the spider's rotated headers as each request goes to the downloader"""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_request(self, request, spider=None):
+        for name, value in self.crawler.spider.get_headers().items():
+            request.headers[name] = value
+        return None
 
 class AmazonSpider(scrapy.Spider):
     name = 'amazon_spider'
+    # Runs before Scrapy's UserAgentMiddleware (500), which only fills a missing User-Agent
+    custom_settings = {
+        'DOWNLOADER_MIDDLEWARES': {RotatingHeadersMiddleware: 400},
+    }
+
+    # Search page XPaths; card lookups are relative to each result card
+    XPATH_CARDS = "//div[@data-component-type='s-search-result']"
+    XPATH_CARD_LINK = f".//a[{has_class('a-link-normal')} and {has_class('s-link-style')} and {has_class('a-text-normal')}]/@href"
+    XPATH_CARD_BRAND = (f".//div[{has_class('a-row')} and {has_class('a-size-base')} and {has_class('a-color-secondary')}]"
+                        "//h2//span/text()")
+
+    # Product page XPaths, written out once so parse_product skips the
+    # CSS-to-XPath translation
+    XPATH_TITLE = "//span[@id='productTitle']/text()"
+    XPATH_SPEC_BRAND = f"//tr[{has_class('po-brand')}]//td[{has_class('a-span9')}]//span/text()"
+    XPATH_MRP = (f"//span[{has_class('a-price')} and {has_class('a-text-price')} and @data-a-strike='true']"
+                 f"//span[{has_class('a-offscreen')}]/text()")
+    XPATH_CURRENT_PRICE = f"//span[{has_class('a-price-whole')}]/text()"
+    XPATH_DISCOUNT = f"//span[{has_class('savingsPercentage')}]/text()"
+    XPATH_RATING = f"//span[{has_class('a-icon-alt')}]/text()"
+    XPATH_REVIEWS = "//span[@id='acrCustomerReviewText']/text()"
+    XPATH_SPEC_ROWS = f"//table[{has_class('a-normal')} and {has_class('a-spacing-micro')}]//tr"
+    XPATH_FACT_ROWS = f"//div[{has_class('a-section')} and @role='list']//div[{has_class('product-facts-detail')}]"
+    # Per-row "key SPEC_SEP value" strings, so each row costs one query
+    # instead of separate key and value lookups
+    XPATH_SPEC_PAIR = (f"concat(string(.//td[{has_class('a-span3')}]//span/text()), '{SPEC_SEP}', "
+                       f"string(.//td[{has_class('a-span9')}]//span/text()))")
+    XPATH_FACT_PAIR = (f"concat(string(.//div[{has_class('a-col-left')}]//span[{has_class('a-color-base')}]/text()), "
+                       f"'{SPEC_SEP}', "
+                       f"string(.//div[{has_class('a-col-right')}]//span[{has_class('a-color-base')}]/text()))")
     
     def __init__(self, query='laptop', pages=5, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -22,14 +100,22 @@ class AmazonSpider(scrapy.Spider):
         base_url = f"https://www.amazon.in/s?k={formatted_query}"
         # Append realistic params (crid, sprefix, ref can be random/static)
         params = "&crid=2K91KPZM8IIUC&sprefix=" + formatted_query + "%2Caps%2C236&ref=nb_sb_noss"
-        if pages >= 1:
-            self.start_urls = [f"{base_url}&page=1{params}"]
-        else:
-            self.start_urls = []
-        self.product_urls = set()
+        # Every results page is requested up front so Scrapy fetches them
+        # concurrently instead of waiting on each page's "next" link
+        self.start_urls = [f"{base_url}&page={page}{params}" for page in range(1, pages + 1)]
+        # Product requests yielded; Scrapy's dupe filter drops repeat URLs
+        self.product_requests = 0
         self.all_spec_keys = set()
-        self.items = []
+        # Digests of written items' ASINs: the same ASIN is often reached via
+        # different URLs (sponsored, affiliate and plain search links)
+        self.item_signatures = set()
+        # Non-empty values per spec key over the items written so far
+        self.spec_key_counts = Counter()
         self.scraped_count = 0
+        # Items are streamed here as they are parsed and consolidated on close,
+        # so memory doesn't grow with the crawl
+        self.raw_path = self.output_path('jsonl.part')
+        self.raw_file = open(self.raw_path, 'wb')
         
         # User agents for rotation
         self.user_agents = [
@@ -59,61 +145,61 @@ class AmazonSpider(scrapy.Spider):
             "https://duckduckgo.com/",
             "https://search.yahoo.com/"
         ]
+        # Every header combination built once; get_headers only picks one.
+        # The dicts are shared, so callers must not mutate them
+        self.header_pool = [
+            {
+                "User-Agent": user_agent,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "Accept-Language": accept_language,
+                "Referer": referer,
+                "DNT": "1",
+                "Upgrade-Insecure-Requests": "1",
+                "Cache-Control": "no-cache"
+            }
+            for user_agent, accept_language, referer
+            in itertools.product(self.user_agents, self.accept_languages, self.referers)
+        ]
     
     def get_headers(self):
-        return {
-            "User-Agent": random.choice(self.user_agents),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": random.choice(self.accept_languages),
-            "Referer": random.choice(self.referers),
-            "DNT": "1",
-            "Upgrade-Insecure-Requests": "1",
-            "Cache-Control": "no-cache"
-        }
+        return random.choice(self.header_pool)
     
     def start_requests(self):
-        for url in self.start_urls:
+        for page, url in enumerate(self.start_urls, start=1):
             yield scrapy.Request(
                 url,
                 callback=self.parse,
-                headers=self.get_headers(),
-                meta={'page': 1}
+                meta={'page': page}
             )
     
     def parse(self, response):
         page = response.meta.get('page', 1)
         
-        product_cards = response.css('div[data-component-type="s-search-result"]')
+        product_cards = response.xpath(self.XPATH_CARDS)
         for card in product_cards:
-            href = card.css('a.a-link-normal.s-link-style.a-text-normal::attr(href)').get()
+            href = card.xpath(self.XPATH_CARD_LINK).get()
             if href and ('/dp/' in href or '/gp/product/' in href):
                 product_url = self.get_product_url(href)
-                if product_url and product_url not in self.product_urls:
-                    brand_snippet = card.css('div.a-row.a-size-base.a-color-secondary h2 span::text').get()
+                if product_url:
+                    brand_snippet = card.xpath(self.XPATH_CARD_BRAND).get()
                     brand_from_card = self.clean_text(brand_snippet) if brand_snippet else ''
-                    self.product_urls.add(product_url)
+                    self.product_requests += 1
                     yield scrapy.Request(
                         product_url,
                         callback=self.parse_product,
-                        headers=self.get_headers(),
                         priority=1,
                         meta={'page': page, 'brand_from_card': brand_from_card}
                     )
-        
-        # Handle pagination
-        if page < self.pages:
-            next_page = response.css('a.s-pagination-next::attr(href)').get()
-            if next_page:
-                next_page_url = urljoin('https://www.amazon.in', next_page)
-                yield scrapy.Request(
-                    next_page_url, 
-                    callback=self.parse,
-                    headers=self.get_headers(),
-                    meta={'page': page + 1}
-                )
     
     def get_product_url(self, href):
         """Extract actual product URL from Amazon's redirect URL"""
+        # Fast path for direct product links: drop the /ref= path segment and
+        # tracking params without a full URL parse, keeping variant params
+        if href.startswith('/') and not href.startswith(('//', '/sspa/')):
+            path, _, query = href.partition('?')
+            path = path.partition('/ref=')[0]
+            params = [p for p in query.split('&') if p and p.partition('=')[0] not in TRACKING_PARAMS]
+            return 'https://www.amazon.in' + path + ('?' + '&'.join(params) if params else '')
         if href.startswith('/sspa/click?'):
             parsed = urlparse(href)
             query_params = parse_qs(parsed.query)
@@ -129,18 +215,24 @@ class AmazonSpider(scrapy.Spider):
         if not text:
             return default
         
-        text = text.strip()
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        return text
+        # Strip and collapse runs of whitespace
+        return collapse_whitespace(text)
     
     def extract_price(self, price_text):
         """Extract numerical value from price text"""
         if not price_text:
             return ''
         
-        # Remove currency symbols and commas
-        price_text = re.sub(r'[^\d.]', '', price_text)
+        # Remove currency symbols and commas; the regex only handles leftovers
+        stripped = price_text.translate(PRICE_STRIP)
+        if stripped.replace('.', '').isdecimal():
+            price_text = stripped
+        else:
+            price_text = NON_PRICE_RE.sub('', price_text)
+            # Nothing numeric left (e.g. "Currently unavailable"): skip the
+            # raise/catch in float()
+            if not price_text:
+                return ''
         try:
             return str(int(float(price_text)))
         except ValueError:
@@ -151,7 +243,7 @@ class AmazonSpider(scrapy.Spider):
         if not discount_text:
             return ''
         # Remove any non-digit characters (keep only digits)
-        discount_text = re.sub(r'[^\d]', '', discount_text)
+        discount_text = NON_DIGIT_RE.sub('', discount_text)
         return discount_text
     
     def extract_rating(self, rating_text):
@@ -159,8 +251,13 @@ class AmazonSpider(scrapy.Spider):
         if not rating_text:
             return ''
         
-        # Extract just the numeric part
-        match = re.search(r'(\d+\.\d+)', rating_text)
+        # Usual shape is "4.3 out of 5 stars": take the first token if it is
+        # already a decimal, else search the whole text
+        head = rating_text.partition(' ')[0]
+        whole, dot, frac = head.partition('.')
+        if dot and whole.isdecimal() and frac.isdecimal():
+            return head
+        match = RATING_RE.search(rating_text)
         if match:
             return match.group(1)
         return ''
@@ -171,7 +268,7 @@ class AmazonSpider(scrapy.Spider):
             return ''
         
         # Extract numbers from text
-        numbers = re.findall(r'[\d,]+', reviews_text)
+        numbers = COUNT_RE.findall(reviews_text)
         if numbers:
             try:
                 return numbers[0].replace(',', '')
@@ -180,65 +277,25 @@ class AmazonSpider(scrapy.Spider):
         return ''
     
     def preprocess_data(self, item):
-        """Preprocess and clean the extracted data with robust price/discount checks"""
+        """Preprocess and clean the extracted text and numeric fields"""
         # Clean text fields
         for field in ['Title', 'Brand', 'MRP', 'Current Price', 'Discount', 'Rating', 'Reviews']:
             if field in item:
                 item[field] = self.clean_text(item[field])
 
         # Extract numeric values
-        mrp_val = self.extract_price(item.get('MRP', ''))
-        current_val = self.extract_price(item.get('Current Price', ''))
-        discount_val = self.extract_discount(item.get('Discount', ''))
-
-        mrp_val = int(mrp_val) if mrp_val else None
-        current_val = int(current_val) if current_val else None
-        discount_val_num = int(discount_val) if discount_val else None
-
-        # --- Custom rules ---
-        # 1. If MRP is missing but Current Price is available, set MRP = Current Price, Discount = 0
-        if (mrp_val is None or mrp_val == 0) and (current_val is not None and current_val != 0):
-            mrp_val = current_val
-            discount_val_num = 0
-        # 2. If discount is negative, set Current Price = MRP and Discount = 0
-        if (
-            discount_val_num is not None
-            and discount_val_num < 0
-            and mrp_val is not None
-        ):
-            current_val = mrp_val
-            discount_val_num = 0
-
-        # Fill missing values based on available columns
-        try:
-            if current_val is None and mrp_val is not None and discount_val_num is not None:
-                current_val = round(mrp_val * (1 - discount_val_num / 100))
-            if discount_val_num is None and mrp_val is not None and current_val is not None and mrp_val != 0:
-                discount_val_num = round((mrp_val - current_val) / mrp_val * 100)
-            if mrp_val is None and current_val is not None and discount_val_num is not None and discount_val_num != 100:
-                mrp_val = round(current_val / (1 - discount_val_num / 100))
-        except Exception:
-            pass
-
-        # Correct Current Price if it deviates >5% from expected
-        try:
-            if mrp_val is not None and discount_val_num is not None:
-                expected_price = round(mrp_val * (1 - discount_val_num / 100))
-                if current_val is not None:
-                    lower_bound = expected_price * 0.95
-                    upper_bound = expected_price * 1.05
-                    if not (lower_bound <= current_val <= upper_bound):
-                        current_val = expected_price
-                else:
-                    current_val = expected_price
-        except Exception:
-            pass
-
-        # Update item with final values
-        item['MRP'] = str(mrp_val) if mrp_val is not None else ''
-        item['Current Price'] = str(current_val) if current_val is not None else ''
+        mrp = self.extract_price(item.get('MRP', ''))
+        current = self.extract_price(item.get('Current Price', ''))
         # Discount numeric value only (no % sign)
-        item['Discount'] = str(discount_val_num) if discount_val_num is not None else ''
+        discount = self.extract_discount(item.get('Discount', ''))
+
+        # Settle the MRP/price/discount rules here so yielded items carry the
+        # final values: reconcile_prices on columns of one keeps the arithmetic
+        mrp, current, discount = self.reconcile_prices(
+            self.price_column([mrp]), self.price_column([current]), self.price_column([discount]))
+        item['MRP'] = str(int(mrp[0])) if not np.isnan(mrp[0]) else ''
+        item['Current Price'] = str(int(current[0])) if not np.isnan(current[0]) else ''
+        item['Discount'] = str(int(discount[0])) if not np.isnan(discount[0]) else ''
 
         # Process rating and reviews as before
         item['Rating'] = self.extract_rating(item.get('Rating', ''))
@@ -246,55 +303,97 @@ class AmazonSpider(scrapy.Spider):
 
         return item
     
+    def price_column(self, values):
+        """Digit strings ('' when missing) as a float array with NaN for missing"""
+        return np.array([float(v) if v else np.nan for v in values])
+
+    def reconcile_prices(self, mrp, current, discount):
+        """Apply the price/discount rules to whole columns with vectorized NumPy ops"""
+        has_mrp, has_current = ~np.isnan(mrp), ~np.isnan(current)
+
+        # --- Custom rules ---
+        # 1. If MRP is missing but Current Price is available, set MRP = Current Price, Discount = 0
+        rule = (~has_mrp | (mrp == 0)) & has_current & (current != 0)
+        mrp = np.where(rule, current, mrp)
+        discount = np.where(rule, 0, discount)
+        # 2. If discount is negative, set Current Price = MRP and Discount = 0
+        rule = (discount < 0) & ~np.isnan(mrp)
+        current = np.where(rule, mrp, current)
+        discount = np.where(rule, 0, discount)
+
+        # Fill missing values based on available columns (each step sees the previous fills)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fill = np.isnan(current) & ~np.isnan(mrp) & ~np.isnan(discount)
+            current = np.where(fill, np.round(mrp * (1 - discount / 100)), current)
+            fill = np.isnan(discount) & ~np.isnan(mrp) & ~np.isnan(current) & (mrp != 0)
+            discount = np.where(fill, np.round((mrp - current) / mrp * 100), discount)
+            fill = np.isnan(mrp) & ~np.isnan(current) & ~np.isnan(discount) & (discount != 100)
+            mrp = np.where(fill, np.round(current / (1 - discount / 100)), mrp)
+
+        # Correct Current Price if it deviates >5% from expected (or is missing)
+        expected = np.round(mrp * (1 - discount / 100))
+        off = np.isnan(current) | (current < expected * 0.95) | (current > expected * 1.05)
+        current = np.where(~np.isnan(mrp) & ~np.isnan(discount) & off, expected, current)
+        return mrp, current, discount
+
     def parse_product(self, response):
         try:
             # Extract basic product information
-            title = response.css('span#productTitle::text').get()
+            title = response.xpath(self.XPATH_TITLE).get()
             brand = response.meta.get('brand_from_card', '')
             
             if not brand:
-                brand_from_specs = response.css('tr.po-brand td.a-span9 span::text').get()
+                brand_from_specs = response.xpath(self.XPATH_SPEC_BRAND).get()
                 if brand_from_specs:
                     brand = self.clean_text(brand_from_specs)
             
             # Extract MRP
-            mrp_element = response.css('span.a-price.a-text-price[data-a-strike="true"] span.a-offscreen::text').get()
+            mrp_element = response.xpath(self.XPATH_MRP).get()
             mrp = self.clean_text(mrp_element) if mrp_element else ''
             
+            # Skip products already written under another URL. Pages without a
+            # title (robot checks, blocked responses) are never deduplicated.
+            # The ASIN identifies the product; title|brand|mrp only stands in
+            # when the URL carries none
+            title_text = self.clean_text(title or '')
+            if title_text:
+                asin_match = ASIN_RE.search(response.url)
+                key = asin_match.group(1) if asin_match else f"{title_text}|{brand}|{mrp}"
+                signature = hashlib.blake2b(key.encode(), digest_size=16).digest()
+                if signature in self.item_signatures:
+                    return
+                self.item_signatures.add(signature)
+            
             # Extract current price
-            current_price_element = response.css('span.a-price-whole::text').get()
+            current_price_element = response.xpath(self.XPATH_CURRENT_PRICE).get()
             current_price = self.clean_text(current_price_element) if current_price_element else ''
             
             # Extract discount percentage
-            discount_element = response.css('span.savingsPercentage::text').get()
+            discount_element = response.xpath(self.XPATH_DISCOUNT).get()
             discount = self.clean_text(discount_element) if discount_element else ''
             
             # Extract rating
-            rating_element = response.css('span.a-icon-alt::text').get()
+            rating_element = response.xpath(self.XPATH_RATING).get()
             rating = self.clean_text(rating_element) if rating_element else ''
             
             # Extract number of reviews
-            reviews_element = response.css('span#acrCustomerReviewText::text').get()
+            reviews_element = response.xpath(self.XPATH_REVIEWS).get()
             reviews = self.clean_text(reviews_element) if reviews_element else ''
             
             # Extract specifications
             specs = {}
-            spec_rows = response.css('table.a-normal.a-spacing-micro tr')
-            for row in spec_rows:
-                key_element = row.css('td.a-span3 span::text')
-                value_element = row.css('td.a-span9 span::text')
+            for pair in response.xpath(self.XPATH_SPEC_ROWS).xpath(self.XPATH_SPEC_PAIR).getall():
+                key_element, _, value_element = pair.partition(SPEC_SEP)
                 
-                if key_element.get() and value_element.get():
-                    key = self.clean_text(key_element.get())
-                    value = self.clean_text(value_element.get())
+                if key_element and value_element:
+                    key = self.clean_text(key_element)
+                    value = self.clean_text(value_element)
                     specs[key] = value
                     self.all_spec_keys.add(key)
             
             if not specs:
-                fact_rows = response.css('div.a-section[role="list"] div.product-facts-detail')
-                for row in fact_rows:
-                    key_element = row.css('div.a-col-left span.a-color-base::text').get()
-                    value_element = row.css('div.a-col-right span.a-color-base::text').get()
+                for pair in response.xpath(self.XPATH_FACT_ROWS).xpath(self.XPATH_FACT_PAIR).getall():
+                    key_element, _, value_element = pair.partition(SPEC_SEP)
                     
                     if key_element and value_element:
                         key = self.clean_text(key_element)
@@ -321,11 +420,14 @@ class AmazonSpider(scrapy.Spider):
             
             # Preprocess the data
             item = self.preprocess_data(item)
-            self.items.append(item)
+            self.raw_file.write(orjson.dumps(item) + b'\n')
+            self.spec_key_counts.update(k for k, v in specs.items() if v and str(v).strip())
             
-            # Update scraped count and show progress
+            # Update scraped count and show progress every 10 products, so
+            # stdout writes don't stall the reactor under high concurrency
             self.scraped_count += 1
-            print(f"URLs found: {len(self.product_urls)} | Products scraped: {self.scraped_count}", end="\r")
+            if self.scraped_count % 10 == 0:
+                print(f"URLs found: {self.url_count()} | Products scraped: {self.scraped_count}", end="\r")
             
             yield item
             
@@ -333,73 +435,70 @@ class AmazonSpider(scrapy.Spider):
             print(f"Error: {type(e).__name__}")
     
     def closed(self, reason):
-        # After spider closes, write data to CSV
-        self.write_to_csv()
-        print(f"\nScraping completed. URLs: {len(self.product_urls)}, Products: {self.scraped_count}")
+        # After spider closes, write the outputs from the raw stream
+        self.raw_file.close()
+        self.write_outputs()
+        os.remove(self.raw_path)
+        print(f"\nScraping completed. URLs: {self.url_count()}, Products: {self.scraped_count}")
     
-    def write_to_csv(self):
+    def url_count(self):
+        """Unique product URLs requested so far"""
+        stats = self.crawler.stats if hasattr(self, 'crawler') else None
+        filtered = stats.get_value('dupefilter/filtered', 0) if stats else 0
+        return self.product_requests - filtered
+
+    def output_path(self, extension):
+        """Path of an output file under the project's data directory"""
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        data_dir = os.path.join(base_dir, "data")
+        os.makedirs(data_dir, exist_ok=True)
+        return os.path.join(data_dir, f'amazon_{self.query}_products.{extension}')
+
+    def read_raw_items(self):
+        """Stream the items written during the crawl back from disk"""
+        with open(self.raw_path, 'rb') as raw_file:
+            for line in raw_file:
+                yield orjson.loads(line)
+
+    def write_outputs(self):
+        """Write the CSV and the JSON Lines dump (one orjson item per line, specs nested)"""
         # Constant fields, with 'Discount %' as the column header
         constant_fields = ['URL', 'Title', 'Brand', 'MRP', 'Current Price', 'Discount %', 'Rating', 'Reviews']
+        # Item keys behind each constant column ('Discount %' holds the numeric 'Discount')
+        item_fields = ['URL', 'Title', 'Brand', 'MRP', 'Current Price', 'Discount', 'Rating', 'Reviews']
         placeholder = 'N/A'
 
-        # Step 1: Count non-empty entries for each spec key across all items
-        spec_counts = defaultdict(int)
-        total_items = len(self.items)
-        for item in self.items:
-            specs = item.get('specs', {})
-            for key in self.all_spec_keys:
-                value = specs.get(key, '')
-                if value and str(value).strip():
-                    spec_counts[key] += 1
+        # Step 1: prices were settled per item in preprocess_data
+        total_items = self.scraped_count
 
-        # Step 2: Keep only spec keys with at least 40% non-empty data
+        # Step 2: Keep only spec keys with at least 40% non-empty data (counted
+        # in parse_product as items were written)
         threshold = int(0.4 * total_items)
-        filtered_spec_keys = sorted([k for k in self.all_spec_keys if spec_counts[k] >= threshold])
-
-        # Remove duplicate spec keys while preserving order
-        seen = set()
-        unique_filtered_spec_keys = []
-        for key in filtered_spec_keys:
-            if key not in seen:
-                unique_filtered_spec_keys.append(key)
-                seen.add(key)
+        # all_spec_keys is a set, so the sorted keys are already unique
+        filtered_spec_keys = sorted(k for k in self.all_spec_keys if self.spec_key_counts[k] >= threshold)
 
         # Step 3: Write the CSV using these filtered keys along with constant fields (no duplicate columns)
-        fieldnames = constant_fields + unique_filtered_spec_keys
-        import os
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(base_dir, "data")
-        os.makedirs(data_dir, exist_ok=True)
-        filename = os.path.join(data_dir, f'amazon_{self.query}_products.csv')
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for item in self.items:
+        fieldnames = constant_fields + filtered_spec_keys
+
+        def cell(val):
+            # Fill missing or empty values with the placeholder
+            return placeholder if val is None or str(val).strip() == '' else val
+
+        with open(self.output_path('csv'), 'w', newline='', encoding='utf-8') as csvfile, \
+                open(self.output_path('jsonl'), 'wb') as jsonlfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            # One pass: write each item as it is read
+            for item in self.read_raw_items():
+                jsonlfile.write(orjson.dumps(item) + b'\n')
+
                 # Skip rows where 'Brand' is missing or empty
                 brand_val = item.get('Brand', '')
                 if brand_val is None or str(brand_val).strip() == '':
                     continue
-                # Fill constant fields with placeholder if missing or empty
-                row = {}
-                for field in constant_fields:
-                    # For 'Discount %', use the numeric value from 'Discount'
-                    if field == 'Discount %':
-                        val = item.get('Discount', '')
-                    else:
-                        val = item.get(field, '')
-                    if val is None or str(val).strip() == '':
-                        row[field] = placeholder
-                    else:
-                        row[field] = val
-                # Fill spec fields with placeholder if missing or empty
                 specs = item.get('specs', {}) if isinstance(item.get('specs', {}), dict) else {}
-                for key in unique_filtered_spec_keys:
-                    sval = specs.get(key, '')
-                    if sval is None or str(sval).strip() == '':
-                        row[key] = placeholder
-                    else:
-                        row[key] = sval
-                writer.writerow(row)
+                writer.writerow([cell(item.get(field, '')) for field in item_fields] +
+                                [cell(specs.get(key, '')) for key in filtered_spec_keys])
 
 if __name__ == "__main__":
     # Configure Scrapy settings for maximum speed
@@ -424,6 +523,10 @@ if __name__ == "__main__":
     settings.set('REDIRECT_MAX_TIMES', 2)  # Reduce redirects
     settings.set('AJAXCRAWL_ENABLED', False)  # Disable AJAX crawling
     settings.set('TELNETCONSOLE_ENABLED', False)  # Disable telnet
+    # HTTP/2: one TLS connection per host carries many concurrent requests
+    # (needs Twisted[http2]; stay on HTTP/1.1 when h2 isn't installed)
+    if importlib.util.find_spec('h2') is not None:
+        settings.set('DOWNLOAD_HANDLERS', {'https': 'scrapy.core.downloader.handlers.http2.H2DownloadHandler'})
     
     # Get user input
     search_query = input("Enter search query (e.g., 'laptop'): ").strip()